@@ -0,0 +1,58 @@
+import argparse
+import asyncio
+import logging
+
+from git import Repo
+
+from remote_git_mcp import tools
+
+# 每个请求都会输出日志的 logger, 压测时统一调高到 WARNING
+REQUEST_LOGGERS = ["mcp", "fastmcp", "httpx", "uvicorn", "uvicorn.access"]
+
+
+def init_bench_log():
+    """
+    压测日志配置, in-process 模式与 http 服务端共用, 保证两种模式的日志开销一致:
+    只输出到 stderr, 不写日志文件, 屏蔽每个请求的日志
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(name)s %(levelname)s: %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    for name in REQUEST_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        description="Remote Git MCP Benchmark Server",
+    )
+    parser.add_argument("--workspace", type=str, required=True, help="Repo path")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Host")
+    parser.add_argument("--port", type=int, default=8999, help="Port")
+    parser.add_argument("--path", type=str, default="/mcp", help="Mcp Path")
+    return parser.parse_args()
+
+
+async def main():
+    """
+    与 `remote_git_mcp.main` 相比: 不调用 init_log (不写 logs/ 日志文件),
+    不 fetch 远程仓库, 也不启动定时 fetch 任务, 与 in-process 模式保持一致
+    """
+    args = parse_args()
+    init_bench_log()
+    tools.repo = Repo(args.workspace)
+    await tools.mcp.run_async(
+        transport="streamable-http",
+        show_banner=False,
+        host=args.host,
+        port=args.port,
+        path=args.path,
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,526 @@
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+from fastmcp import Client
+from git import Repo
+
+import remote_git_mcp
+from remote_git_mcp import tools
+from bench_server import init_bench_log
+from synthetic_repo import (
+    FILES_PER_DIR,
+    TOKEN_COUNT,
+    branch_names,
+    file_path_of,
+    generate_repo,
+)
+
+logger = logging.getLogger(__name__)
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ALL_TOOLS = ["git_grep", "git_ls_tree", "git_show", "git_remote_branches"]
+# 无参数的工具, 不区分参数组数, 只压测一轮
+NO_ARGS_TOOLS = ["git_remote_branches"]
+# 对比基线时要求一致的参数, 不一致时结果不可比
+COMPARABLE_PARAMS = [
+    "file_count",
+    "file_size",
+    "branch_count",
+    "history_depth",
+    "seed",
+    "requests",
+]
+# 内存采样间隔 (秒)
+MEMORY_SAMPLE_INTERVAL = 0.05
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        description="Remote Git MCP Benchmark",
+    )
+    # 合成仓库参数
+    parser.add_argument("--file-count", type=int, default=1000, help="File count")
+    parser.add_argument(
+        "--file-size", type=int, default=4096, help="Approximate file size (bytes)"
+    )
+    parser.add_argument(
+        "--branch-count", type=int, default=5, help="Branch count (including main)"
+    )
+    parser.add_argument(
+        "--history-depth", type=int, default=20, help="Commit count of main branch"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument(
+        "--repo-dir",
+        type=str,
+        default=os.path.join(BENCH_DIR, ".repos"),
+        help="Directory of generated synthetic repos",
+    )
+    # 压测参数
+    parser.add_argument(
+        "--mode",
+        choices=["in-process", "http", "both"],
+        type=str,
+        default="both",
+        help="Call tools in-process or via a local streamable-http server",
+    )
+    parser.add_argument(
+        "--tools",
+        type=str,
+        default=",".join(ALL_TOOLS),
+        help="Comma separated tool names",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=str,
+        default="1,8,32",
+        help="Comma separated concurrency levels",
+    )
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=200,
+        help="Request count per tool per concurrency level",
+    )
+    parser.add_argument(
+        "--variants",
+        type=str,
+        default="8,1",
+        help=(
+            "Comma separated counts of distinct argument sets per tool, "
+            "1 means all requests are identical (hot key, exercises coalescing)"
+        ),
+    )
+    parser.add_argument(
+        "--port", type=int, default=0, help="HTTP server port, 0 means a free port"
+    )
+    # 结果参数
+    parser.add_argument(
+        "--results-dir",
+        type=str,
+        default=os.path.join(BENCH_DIR, "results"),
+        help="Directory to save results",
+    )
+    parser.add_argument(
+        "--compare", type=str, default=None, help="Baseline result file to compare"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative change regarded as regression when comparing",
+    )
+    return parser.parse_args()
+
+
+def build_variants(
+    args: argparse.Namespace, tool_name: str, variant_count: int
+) -> list[dict]:
+    """为指定工具生成 variant_count 组不同的调用参数"""
+    rnd = random.Random(args.seed)
+    branches = branch_names(args.branch_count)
+    dir_count = max(1, (args.file_count + FILES_PER_DIR - 1) // FILES_PER_DIR)
+    variants = []
+    for i in range(variant_count):
+        branch = branches[i % len(branches)]
+        if tool_name == "git_grep":
+            variants.append(
+                {
+                    "branch": branch,
+                    "text_pattern": f"BENCH_TOKEN_{i % TOKEN_COUNT}",
+                    "file_path_pattern": f"src/mod_{rnd.randrange(dir_count)}/*",
+                    "num_range": [0, 50],
+                }
+            )
+        elif tool_name == "git_ls_tree":
+            variants.append(
+                {
+                    "branch": branch,
+                    "pattern": f"mod_{rnd.randrange(dir_count)}/",
+                    "num_range": [0, 100],
+                }
+            )
+        elif tool_name == "git_show":
+            variants.append(
+                {
+                    "branch": branch,
+                    "file_path": file_path_of(rnd.randrange(args.file_count)),
+                    "line_range": [0, 500],
+                }
+            )
+        else:
+            variants.append({})
+    return variants
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """最近秩法计算百分位数"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def process_tree_pss_kb(pid: int) -> int | None:
+    """
+    读取进程及其已 exec 的子进程 (git 命令) 当前的 PSS 之和, 单位 KB
+
+    避免重复统计父进程内存:
+    - 使用 PSS 而不是 RSS, 共享内存页按共享进程数均摊
+    - 跳过可执行文件与父进程相同的子进程, 即 fork/vfork 之后尚未 exec 的子进程,
+      其内存就是父进程的内存 (vfork 时两者共用同一地址空间, PSS 也会重复)
+    依赖 Linux 的 /proc/<pid>/smaps_rollup (4.14+), 其他平台返回 None
+    """
+    try:
+        exe = os.readlink(f"/proc/{pid}/exe")
+        with open(f"/proc/{pid}/smaps_rollup", encoding="utf-8") as f:
+            pss = next(
+                (int(line.split()[1]) for line in f if line.startswith("Pss:")), 0
+            )
+        task_dir = f"/proc/{pid}/task"
+        child_pids = []
+        for tid in os.listdir(task_dir):
+            with open(os.path.join(task_dir, tid, "children"), encoding="utf-8") as f:
+                child_pids += [int(child) for child in f.read().split()]
+    except (OSError, ValueError):
+        # 进程已退出或平台不支持
+        return None
+    for child_pid in child_pids:
+        try:
+            if os.readlink(f"/proc/{child_pid}/exe") == exe:
+                continue
+        except OSError:
+            continue
+        pss += process_tree_pss_kb(child_pid) or 0
+    return pss
+
+
+class MemorySampler:
+    """在后台线程中定期采样进程树的 PSS, 记录采样期间的峰值"""
+
+    def __init__(self, pid: int, interval: float = MEMORY_SAMPLE_INTERVAL):
+        self._pid = pid
+        self._interval = interval
+        self._peak_kb = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while True:
+            pss = process_tree_pss_kb(self._pid)
+            if pss is not None:
+                self._peak_kb = max(self._peak_kb or 0, pss)
+            if self._stop.wait(self._interval):
+                break
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def peak_pss_mb(self) -> float | None:
+        return round(self._peak_kb / 1024, 3) if self._peak_kb is not None else None
+
+
+async def run_level(
+    client_factory, tool_name: str, variants: list[dict], concurrency: int, total: int
+) -> dict:
+    """
+    以指定并发度调用工具 total 次, 每个并发 worker 使用独立的 MCP 客户端
+    所有客户端建立会话后才开始计时, 吞吐量与延迟均不包含会话握手
+
+    Returns:
+        {"requests", "errors", "p50_ms", "p95_ms", "p99_ms", "throughput_rps"}
+    """
+    latencies = []
+    errors = 0
+    next_index = 0
+    connected = 0
+    all_connected = asyncio.Event()
+    start = 0.0
+    finished = []
+
+    async def worker():
+        nonlocal errors, next_index, connected, start
+        async with client_factory() as client:
+            connected += 1
+            if connected == concurrency:
+                start = time.perf_counter()
+                all_connected.set()
+            await all_connected.wait()
+            while next_index < total:
+                arguments = variants[next_index % len(variants)]
+                next_index += 1
+                request_start = time.perf_counter()
+                try:
+                    result = await client.call_tool(tool_name, arguments)
+                    content = result.structured_content
+                    # 工具内部错误以 {"message": ...} 形式返回
+                    if isinstance(content, dict) and set(content) == {"message"}:
+                        errors += 1
+                        logger.debug(f"{tool_name} {arguments}: {content['message']}")
+                except Exception as e:
+                    errors += 1
+                    logger.debug(f"{tool_name} {arguments}: {e}")
+                latencies.append((time.perf_counter() - request_start) * 1000)
+        # 最后一个请求完成后结束计时, 不包含关闭会话的耗时
+        finished.append(time.perf_counter())
+
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = max(finished) - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "throughput_rps": round(len(latencies) / elapsed, 3) if elapsed > 0 else 0.0,
+    }
+
+
+async def run_mode(
+    args: argparse.Namespace, mode: str, client_factory, server_pid: int
+) -> list[dict]:
+    """
+    依次压测所有工具、参数组数和并发度
+
+    Args:
+        server_pid: 服务端进程, 每轮压测期间采样该进程及其子进程的 PSS 峰值
+    """
+    results = []
+    for tool_name in args.tools.split(","):
+        # 无参数的工具所有请求都相同, 不区分参数组数 (记为 None)
+        if tool_name in NO_ARGS_TOOLS:
+            variant_counts = [None]
+        else:
+            variant_counts = [int(v) for v in args.variants.split(",")]
+        for variant_count in variant_counts:
+            variants = build_variants(args, tool_name, variant_count or 1)
+            # 预热, 避免首次加载 git 对象的开销计入结果
+            async with client_factory() as client:
+                await client.call_tool(tool_name, variants[0])
+            for concurrency in [int(c) for c in args.concurrency.split(",")]:
+                with MemorySampler(server_pid) as sampler:
+                    stats = await run_level(
+                        client_factory, tool_name, variants, concurrency, args.requests
+                    )
+                row = {
+                    "mode": mode,
+                    "tool": tool_name,
+                    "variants": variant_count,
+                    "concurrency": concurrency,
+                    **stats,
+                    "peak_pss_mb": sampler.peak_pss_mb,
+                }
+                logger.info(
+                    f"[{mode}] {tool_name} v={variant_count or '-'} c={concurrency}: "
+                    f"p50={row['p50_ms']}ms p95={row['p95_ms']}ms "
+                    f"p99={row['p99_ms']}ms rps={row['throughput_rps']} "
+                    f"errors={row['errors']} peak_pss={row['peak_pss_mb']}MB"
+                )
+                results.append(row)
+    return results
+
+
+async def run_in_process(args: argparse.Namespace, workspace: str) -> list[dict]:
+    tools.repo = Repo(workspace)
+    return await run_mode(args, "in-process", lambda: Client(tools.mcp), os.getpid())
+
+
+def find_free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_http(args: argparse.Namespace, workspace: str) -> list[dict]:
+    port = args.port or find_free_port()
+    url = f"http://127.0.0.1:{port}/mcp"
+    logger.info(f"Starting streamable-http server at {url} ...")
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            os.path.join(BENCH_DIR, "bench_server.py"),
+            "--workspace",
+            workspace,
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        # 等待服务就绪
+        deadline = time.monotonic() + 60
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError(f"Server exited with code {server.returncode}")
+            try:
+                async with Client(url) as client:
+                    await client.ping()
+                break
+            except Exception:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Server not ready at {url}")
+                await asyncio.sleep(0.5)
+
+        return await run_mode(args, "http", lambda: Client(url), server.pid)
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def get_git_commit() -> str | None:
+    """返回当前项目代码的 commit, 用于区分不同版本的结果"""
+    try:
+        project_dir = os.path.dirname(BENCH_DIR)
+        return Repo(project_dir).head.commit.hexsha
+    except Exception:
+        return None
+
+
+def get_params(args: argparse.Namespace) -> dict:
+    """返回影响压测结果的参数, 随结果一起保存"""
+    return {
+        key: value
+        for key, value in vars(args).items()
+        if key not in ("repo_dir", "results_dir", "compare", "threshold", "port")
+    }
+
+
+def save_results(args: argparse.Namespace, results: list[dict]) -> str:
+    os.makedirs(args.results_dir, exist_ok=True)
+    now = datetime.now()
+    data = {
+        "version": remote_git_mcp.__version__,
+        "git_commit": get_git_commit(),
+        "timestamp": now.isoformat(timespec="seconds"),
+        "params": get_params(args),
+        "results": results,
+    }
+    result_file = os.path.join(
+        args.results_dir,
+        f"bench-{remote_git_mcp.__version__}-{now.strftime('%Y%m%d-%H%M%S')}.json",
+    )
+    with open(result_file, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return result_file
+
+
+def compare_results(
+    baseline_file: str, params: dict, results: list[dict], threshold: float
+) -> int:
+    """
+    与基线结果对比, 延迟升高或吞吐下降超过阈值时标记为回归
+
+    Returns:
+        0: 无回归, 1: 存在回归, 2: 基线参数不一致无法对比
+    """
+    with open(baseline_file, encoding="utf-8") as f:
+        baseline = json.load(f)
+    logger.info(
+        f"Compare with {baseline_file} "
+        f"(version {baseline.get('version')}, commit {baseline.get('git_commit')})"
+    )
+
+    baseline_params = baseline.get("params", {})
+    mismatched = [
+        f"{key}: {baseline_params.get(key)} != {params[key]}"
+        for key in COMPARABLE_PARAMS
+        if baseline_params.get(key) != params[key]
+    ]
+    if mismatched:
+        logger.error(f"Baseline params mismatch, refuse to compare: {mismatched}")
+        return 2
+
+    baseline_rows = {
+        (row["mode"], row["tool"], row.get("variants"), row["concurrency"]): row
+        for row in baseline["results"]
+    }
+    has_regression = False
+    for row in results:
+        base = baseline_rows.get(
+            (row["mode"], row["tool"], row["variants"], row["concurrency"])
+        )
+        if base is None:
+            continue
+        changes = []
+        regression = False
+        for metric, higher_is_better in [
+            ("p50_ms", False),
+            ("p95_ms", False),
+            ("p99_ms", False),
+            ("throughput_rps", True),
+            ("peak_pss_mb", False),
+        ]:
+            # 缺失 (旧版本结果或平台不支持) 的指标不参与对比
+            if not base.get(metric) or row.get(metric) is None:
+                continue
+            ratio = (row[metric] - base[metric]) / base[metric]
+            if (-ratio if higher_is_better else ratio) > threshold:
+                regression = True
+            changes.append(f"{metric} {ratio:+.1%}")
+        has_regression = has_regression or regression
+        log_func = logger.warning if regression else logger.info
+        log_func(
+            f"[{'REGRESSION' if regression else 'ok'}] "
+            f"{row['mode']} {row['tool']} v={row['variants'] or '-'} "
+            f"c={row['concurrency']}: "
+            + ", ".join(changes)
+        )
+    return 1 if has_regression else 0
+
+
+async def main() -> int:
+    args = parse_args()
+    init_bench_log()
+
+    workspace = generate_repo(
+        args.repo_dir,
+        file_count=args.file_count,
+        file_size=args.file_size,
+        branch_count=args.branch_count,
+        history_depth=args.history_depth,
+        seed=args.seed,
+    )
+
+    results = []
+    if args.mode in ("in-process", "both"):
+        results += await run_in_process(args, workspace)
+    if args.mode in ("http", "both"):
+        results += await run_http(args, workspace)
+
+    result_file = save_results(args, results)
+    logger.info(f"Results saved to {result_file}")
+    if args.compare:
+        return compare_results(
+            args.compare, get_params(args), results, args.threshold
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
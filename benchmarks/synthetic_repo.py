@@ -0,0 +1,130 @@
+import logging
+import os
+import random
+import shutil
+
+from git import Repo
+
+logger = logging.getLogger(__name__)
+
+# 默认分支名称, 其余分支命名为 feature_{i}
+MAIN_BRANCH = "main"
+# 生成文件中用于 git grep 检索的关键字数量, 关键字格式为 BENCH_TOKEN_{i}
+TOKEN_COUNT = 10
+# 每个目录下的文件数量
+FILES_PER_DIR = 100
+
+
+def file_path_of(index: int) -> str:
+    """返回第 index 个合成文件的相对路径"""
+    return f"src/mod_{index // FILES_PER_DIR}/file_{index}.py"
+
+
+def branch_names(branch_count: int) -> list[str]:
+    """返回合成仓库的全部分支名称, 第一个为默认分支"""
+    return [MAIN_BRANCH] + [f"feature_{i}" for i in range(1, branch_count)]
+
+
+def _gen_file_content(rnd: random.Random, index: int, file_size: int) -> str:
+    """生成约 file_size 字节的类 Python 代码, 每个函数包含一个检索关键字"""
+    chunks = []
+    size = 0
+    func_idx = 0
+    while size < file_size:
+        token = rnd.randrange(TOKEN_COUNT)
+        chunk = (
+            f"def func_{index}_{func_idx}(value):\n"
+            f"    # BENCH_TOKEN_{token} {rnd.getrandbits(64):016x}\n"
+            f"    result = value * {rnd.randrange(1000)} + {func_idx}\n"
+            f"    return result\n\n\n"
+        )
+        chunks.append(chunk)
+        size += len(chunk)
+        func_idx += 1
+    return "".join(chunks)
+
+
+def _write_file(repo_dir: str, rel_path: str, content: str):
+    abs_path = os.path.join(repo_dir, rel_path)
+    os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+    with open(abs_path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def _commit_random_changes(
+    repo: Repo, rnd: random.Random, file_count: int, file_size: int, message: str
+):
+    """随机重写少量文件并提交"""
+    for _ in range(min(3, file_count)):
+        index = rnd.randrange(file_count)
+        _write_file(
+            repo.working_dir,
+            file_path_of(index),
+            _gen_file_content(rnd, index, file_size),
+        )
+    repo.git.add("-A")
+    repo.git.commit("-q", "-m", message)
+
+
+def generate_repo(
+    output_dir: str,
+    file_count: int = 1000,
+    file_size: int = 4096,
+    branch_count: int = 5,
+    history_depth: int = 20,
+    seed: int = 0,
+) -> str:
+    """
+    生成合成仓库并克隆到本地工作区, 工作区中包含 `origin/*` 远程分支, 可直接作为 WORKSPACE 使用
+    相同参数的仓库已存在时直接复用
+
+    Args:
+        output_dir: 输出目录
+        file_count: 文件数量
+        file_size: 单个文件大小 (字节, 近似值)
+        branch_count: 分支数量 (包含默认分支)
+        history_depth: 默认分支的提交数量
+        seed: 随机数种子
+
+    Returns:
+        工作区路径
+    """
+    name = f"repo-f{file_count}-s{file_size}-b{branch_count}-d{history_depth}-r{seed}"
+    source_dir = os.path.abspath(os.path.join(output_dir, name, "source"))
+    workspace = os.path.abspath(os.path.join(output_dir, name, "workspace"))
+    if os.path.exists(workspace):
+        logger.info(f"Synthetic repo already exists at {workspace}")
+        return workspace
+
+    # 清理上次未完成的生成结果
+    if os.path.exists(source_dir):
+        shutil.rmtree(source_dir)
+
+    logger.info(f"Generating synthetic repo at {source_dir} ...")
+    rnd = random.Random(seed)
+    os.makedirs(source_dir, exist_ok=True)
+    repo = Repo.init(source_dir)
+    repo.git.checkout("-q", "-b", MAIN_BRANCH)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "bench")
+        config.set_value("user", "email", "bench@example.com")
+
+    # 初始提交包含全部文件, 其余提交随机修改少量文件
+    for index in range(file_count):
+        _write_file(
+            source_dir, file_path_of(index), _gen_file_content(rnd, index, file_size)
+        )
+    repo.git.add("-A")
+    repo.git.commit("-q", "-m", "initial commit")
+    for depth in range(1, history_depth):
+        _commit_random_changes(repo, rnd, file_count, file_size, f"commit {depth}")
+
+    # 每个分支从默认分支派生并包含一个独立提交
+    for branch in branch_names(branch_count)[1:]:
+        repo.git.checkout("-q", "-b", branch, MAIN_BRANCH)
+        _commit_random_changes(repo, rnd, file_count, file_size, f"{branch} commit")
+    repo.git.checkout("-q", MAIN_BRANCH)
+
+    logger.info(f"Cloning synthetic repo to {workspace} ...")
+    Repo.clone_from(source_dir, workspace)
+    return workspace
@@ -4,7 +4,7 @@ import os
 import re
 
 from fastmcp import FastMCP
-from git import Repo
+from git import GitCommandError, Repo
 from pydantic import Field
 
 logger = logging.getLogger(__name__)
@@ -87,7 +87,10 @@ Truncated: {len(text) - len(truncated):,} characters
 
     @staticmethod
     def parse_git_grep_result(
-        origin_output: str, num_range: list[int], chunk_limit_per_file: int = 0
+        origin_output: str,
+        num_range: list[int],
+        chunk_limit_per_file: int = 0,
+        revision: str | None = None,
     ) -> dict:
         """
         解析'git grep -W -n --heading'命令的输出, 将其转换为结构化的数据
@@ -97,6 +100,7 @@ Truncated: {len(text) - len(truncated):,} characters
             origin_output: git grep 命令的原始输出
             num_range: 结果范围, 格式为 [start, end], 左闭右开区间, 下标从0开始
             chunk_limit_per_file: 每个文件的最大匹配数量限制, 0表示无限制
+            revision: git grep 检索的版本 (如 commit SHA), 为空时按 `origin/branch` 解析文件路径行
 
         Returns:
             包含搜索结果的字典, 格式如下:
@@ -116,12 +120,36 @@ Truncated: {len(text) - len(truncated):,} characters
         if not origin_output.strip():
             return {"total": 0, "results": []}
 
+        results = ResultParseUtil.parse_git_grep_blocks(
+            origin_output, chunk_limit_per_file, revision
+        )
+        return ResultParseUtil.paginate_git_grep_blocks(results, num_range)
+
+    @staticmethod
+    def parse_git_grep_blocks(
+        origin_output: str, chunk_limit_per_file: int = 0, revision: str | None = None
+    ) -> list[dict]:
+        """
+        解析'git grep -W -n --heading'命令的输出, 返回全部代码块, 不做分页
+
+        Args:
+            参考 parse_git_grep_result
+
+        Returns:
+            [{"file_path": "文件路径", "line_range": [起始行号, 结束行号], "content": "文件内容"}, ...]
+        """
         # git grep --heading 使用 `--` 作为代码段之间的分隔符
         blocks = origin_output.split("--\n")
         results = []
         current_file_path = None
         current_file_match_count = 0  # 当前文件的匹配计数
 
+        # 文件路径行格式: origin/branch:file_path 或 revision:file_path
+        if revision:
+            file_path_regex = re.compile(rf"^{re.escape(revision)}:(.+)$")
+        else:
+            file_path_regex = re.compile(r"^origin/[^:]+:(.+)$")
+
         # 遍历每个代码块进行处理
         for block in blocks:
             if not block.strip():
@@ -131,9 +159,9 @@ Truncated: {len(text) - len(truncated):,} characters
             if not lines:
                 continue
 
-            # 匹配文件路径行, 格式: origin/branch:file_path
+            # 匹配文件路径行
             first_line = lines[0]
-            file_path_match = re.match(r"^origin/[^:]+:(.+)$", first_line)
+            file_path_match = file_path_regex.match(first_line)
 
             if file_path_match:
                 # 新文件开始,重置计数器
@@ -205,7 +233,11 @@ Truncated: {len(text) - len(truncated):,} characters
             # 处理剩余的代码行
             try_add_code(max_length=0)
 
-        # 计算分页边界
+        return results
+
+    @staticmethod
+    def paginate_git_grep_blocks(results: list[dict], num_range: list[int]) -> dict:
+        """按 num_range 截取 parse_git_grep_blocks 的结果, 返回格式参考 parse_git_grep_result"""
         total_count = len(results)
         result_range = ResultParseUtil.parse_result_range(total_count, num_range)
         return {
@@ -215,6 +247,49 @@ Truncated: {len(text) - len(truncated):,} characters
         }
 
 
+class SingleFlightUtil:
+    """
+    合并相同参数的并发请求 (single-flight): 同一时刻相同 key 的请求只会执行一次,
+    其余请求等待并共享同一个执行结果, 执行结束后立即移除, 不做结果缓存
+    """
+
+    def __init__(self):
+        self._inflight: dict[tuple, asyncio.Task] = {}
+
+    async def do(self, key: tuple, func, *args):
+        """
+        在线程池中执行 func(*args), 相同 key 的并发调用共享同一次执行
+
+        Args:
+            key: 请求唯一标识, 一般为 (工具名, 分支, 分支 SHA, 查询参数...), 不包含分页参数
+            func: 同步执行函数
+            args: 执行函数参数
+
+        Returns:
+            func 的返回值, 在所有等待者之间共享, 只能读取不能修改 (分页等处理需生成新对象)
+            func 抛出的异常会传递给所有等待者, 异常对象同样是共享的, 只能读取
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(asyncio.to_thread(func, *args))
+            self._inflight[key] = task
+
+            def remove_inflight(done_task: asyncio.Task):
+                if self._inflight.get(key) is done_task:
+                    del self._inflight[key]
+
+            task.add_done_callback(remove_inflight)
+        else:
+            logger.debug(f"Coalescing in-flight request: {key}")
+
+        # shield: 单个调用方被取消时不影响其他共享该执行的调用方
+        return await asyncio.shield(task)
+
+
+# 合并并发的相同查询请求
+single_flight = SingleFlightUtil()
+
+
 class GitRepoUtil:
     @staticmethod
     def init_server_code_repo():
@@ -246,6 +321,33 @@ class GitRepoUtil:
         repo = Repo.clone_from(git_repo_url, workspace)
         return repo
 
+    @staticmethod
+    def get_remote_branch_sha(branch: str) -> str | None:
+        """
+        获取远程分支当前指向的 commit SHA
+
+        Args:
+            branch: 分支名称, 不包含 `origin/` 前缀
+
+        Returns:
+            commit SHA, 分支不存在时返回 None
+        """
+        global repo
+        target_remote_branch = f"origin/{branch}"
+        for ref in repo.remote().refs:
+            if ref.name == target_remote_branch:
+                return ref.commit.hexsha
+        return None
+
+    @staticmethod
+    def format_git_error(
+        e: GitCommandError, branch: str, branch_sha: str | None
+    ) -> str:
+        """git 命令基于 commit SHA 执行, 错误信息中的 SHA 替换为 `origin/branch`, 便于调用方定位分支"""
+        if not branch_sha:
+            return str(e)
+        return str(e).replace(branch_sha, f"origin/{branch}")
+
     @staticmethod
     async def git_fetch_task(interval: int = 300):
         """定时拉取git仓库的后台任务"""
@@ -300,42 +402,27 @@ async def git_grep(
         }
     """
     global repo
+    branch_sha = None
     try:
         target_remote_branch = f"origin/{branch}"
-        remote_branches = [ref.name for ref in repo.remote().refs]
+        branch_sha = GitRepoUtil.get_remote_branch_sha(branch)
 
-        if target_remote_branch not in remote_branches:
+        if branch_sha is None:
             return {
                 "message": f"Branch `{target_remote_branch}` not found in remote repository"
             }
         if not ResultParseUtil.check_num_range(num_range):
             return {"message": f"Invalid num_range: {num_range}"}
 
-        # -W: 显示整个函数/代码块上下文 (对传统语言 (C/Java/Python) 支持较好, 对现代语言支持有限, 通过 -C 弥补)
-        # -H: 显示文件名
-        # -n: 显示行号
-        # -i: 忽略大小写
-        # -I: 忽略二进制文件
-        # -E: 启用扩展正则表达式语法
-        # -C 3: 显示3行上下文
-        # --heading: 将文件名作为标题显示 (只显示一次, 方便解析)
-        result = repo.git.grep(
-            "-W",
-            "-H",
-            "-n",
-            "-i",
-            "-I",
-            "-E",
-            "-C",
-            "3",
-            "--heading",
-            f"{text_pattern}",
-            target_remote_branch,
-            "--",
-            f"{file_path_pattern}",
+        # 分页参数不参与合并, 共享完整的解析结果后按调用方的 num_range 截取
+        results = await single_flight.do(
+            ("git_grep", branch, branch_sha, text_pattern, file_path_pattern),
+            _run_git_grep,
+            branch_sha,
+            text_pattern,
+            file_path_pattern,
         )
-
-        parsed_result = ResultParseUtil.parse_git_grep_result(result, num_range)
+        parsed_result = ResultParseUtil.paginate_git_grep_blocks(results, num_range)
         if not parsed_result["results"]:
             return {
                 "message": f"No matches found for pattern `{text_pattern}` in branch `{branch}`"
@@ -343,12 +430,53 @@ async def git_grep(
 
         return parsed_result
 
+    except GitCommandError as e:
+        error_msg = (
+            f"Error when git grep: {GitRepoUtil.format_git_error(e, branch, branch_sha)}"
+        )
+        logger.error(error_msg)
+        return {"message": error_msg}
     except Exception as e:
         error_msg = f"Error when git grep: {str(e)}"
         logger.error(error_msg)
         return {"message": error_msg}
 
 
+def _run_git_grep(
+    branch_sha: str, text_pattern: str, file_path_pattern: str
+) -> list[dict]:
+    """在 branch_sha 上执行 git grep 并解析全部结果, 在线程池中运行"""
+    global repo
+
+    # -W: 显示整个函数/代码块上下文 (对传统语言 (C/Java/Python) 支持较好, 对现代语言支持有限, 通过 -C 弥补)
+    # -H: 显示文件名
+    # -n: 显示行号
+    # -i: 忽略大小写
+    # -I: 忽略二进制文件
+    # -E: 启用扩展正则表达式语法
+    # -C 3: 显示3行上下文
+    # --heading: 将文件名作为标题显示 (只显示一次, 方便解析)
+    result = repo.git.grep(
+        "-W",
+        "-H",
+        "-n",
+        "-i",
+        "-I",
+        "-E",
+        "-C",
+        "3",
+        "--heading",
+        f"{text_pattern}",
+        branch_sha,
+        "--",
+        f"{file_path_pattern}",
+    )
+
+    if not result.strip():
+        return []
+    return ResultParseUtil.parse_git_grep_blocks(result, revision=branch_sha)
+
+
 @mcp.tool()
 async def git_ls_tree(
     branch: str = Field(..., description=branch_param_description),
@@ -383,30 +511,25 @@ async def git_ls_tree(
         }
     """
     global repo
+    branch_sha = None
     try:
         target_remote_branch = f"origin/{branch}"
-        remote_branches = [ref.name for ref in repo.remote().refs]
+        branch_sha = GitRepoUtil.get_remote_branch_sha(branch)
 
-        if target_remote_branch not in remote_branches:
+        if branch_sha is None:
             return {
                 "message": f"Branch `{target_remote_branch}` not found in remote repository",
             }
         if not ResultParseUtil.check_num_range(num_range):
             return {"message": f"Invalid num_range: {num_range}"}
 
-        # -r: 递归列出所有文件
-        # --name-only: 只显示文件名,不显示其他信息
-        result = repo.git.ls_tree("-r", "--name-only", target_remote_branch)
-
-        import re
-
-        # 解析文件列表并使用正则表达式过滤
-        file_list = result.split("\n") if result else []
-        filtered_files = []
-
-        for file_path in file_list:
-            if file_path.strip() and re.search(pattern, file_path):
-                filtered_files.append(file_path)
+        # 分页参数不参与合并, 共享完整的文件列表后按调用方的 num_range 截取
+        filtered_files = await single_flight.do(
+            ("git_ls_tree", branch, branch_sha, pattern),
+            _run_git_ls_tree,
+            branch_sha,
+            pattern,
+        )
         if not filtered_files:
             return {
                 "message": f"No files found for pattern `{pattern}` in branch `{branch}`",
@@ -420,12 +543,37 @@ async def git_ls_tree(
             "num_range": result_count_range,
             "files": filtered_files[result_count_range[0] : result_count_range[1]],
         }
+    except GitCommandError as e:
+        error_msg = (
+            f"Error when git ls-tree: "
+            f"{GitRepoUtil.format_git_error(e, branch, branch_sha)}"
+        )
+        logger.error(error_msg)
+        return {"message": error_msg}
     except Exception as e:
         error_msg = f"Error when git ls-tree: {str(e)}"
         logger.error(error_msg)
         return {"message": error_msg}
 
 
+def _run_git_ls_tree(branch_sha: str, pattern: str) -> list[str]:
+    """在 branch_sha 上执行 git ls-tree 并过滤文件列表, 在线程池中运行"""
+    global repo
+
+    # -r: 递归列出所有文件
+    # --name-only: 只显示文件名,不显示其他信息
+    result = repo.git.ls_tree("-r", "--name-only", branch_sha)
+
+    # 解析文件列表并使用正则表达式过滤
+    file_list = result.split("\n") if result else []
+    filtered_files = []
+
+    for file_path in file_list:
+        if file_path.strip() and re.search(pattern, file_path):
+            filtered_files.append(file_path)
+    return filtered_files
+
+
 @mcp.tool()
 async def git_show(
     branch: str = Field(..., description=branch_param_description),
@@ -457,20 +605,25 @@ async def git_show(
         }
     """
     global repo
+    branch_sha = None
     try:
         target_remote_branch = f"origin/{branch}"
-        remote_branches = [ref.name for ref in repo.remote().refs]
+        branch_sha = GitRepoUtil.get_remote_branch_sha(branch)
 
-        if target_remote_branch not in remote_branches:
+        if branch_sha is None:
             return {
                 "message": f"Branch `{target_remote_branch}` not found in remote repository",
             }
         if not ResultParseUtil.check_num_range(line_range):
             return {"message": f"Invalid line_range: {line_range}"}
 
-        # 格式: git show branch:file_path
-        result = repo.git.show(f"{target_remote_branch}:{file_path}")
-        lines = result.split("\n")
+        # 行号范围不参与合并, 共享完整的文件内容后按调用方的 line_range 截取
+        lines = await single_flight.do(
+            ("git_show", branch, branch_sha, file_path),
+            _run_git_show,
+            branch_sha,
+            file_path,
+        )
         if not lines:
             return {
                 "message": f"No lines found for file `{file_path}` in branch `{branch}`",
@@ -485,12 +638,27 @@ async def git_show(
             "line_range": result_line_range,
             "content": "\n".join(lines[result_line_range[0] : result_line_range[1]]),
         }
+    except GitCommandError as e:
+        error_msg = (
+            f"Error when git show: {GitRepoUtil.format_git_error(e, branch, branch_sha)}"
+        )
+        logger.error(error_msg)
+        return {"message": error_msg}
     except Exception as e:
         error_msg = f"Error when git show: {str(e)}"
         logger.error(error_msg)
         return {"message": error_msg}
 
 
+def _run_git_show(branch_sha: str, file_path: str) -> list[str]:
+    """在 branch_sha 上执行 git show 并按行拆分文件内容, 在线程池中运行"""
+    global repo
+
+    # 格式: git show commit:file_path
+    result = repo.git.show(f"{branch_sha}:{file_path}")
+    return result.split("\n")
+
+
 @mcp.tool()
 async def git_remote_branches():
     """
@@ -0,0 +1,139 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from git import Git, Repo
+
+from remote_git_mcp import tools
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """本地合成仓库: main 与 alias 指向同一个 commit, 克隆后作为 tools.repo"""
+    source = Repo.init(tmp_path / "source")
+    source.git.checkout("-q", "-b", "main")
+    with source.config_writer() as config:
+        config.set_value("user", "name", "test")
+        config.set_value("user", "email", "test@example.com")
+    (tmp_path / "source" / "a.py").write_text("def foo():\n    return 1\n")
+    source.git.add("-A")
+    source.git.commit("-q", "-m", "init")
+    source.git.branch("alias")
+    repo = Repo.clone_from(tmp_path / "source", tmp_path / "workspace")
+    monkeypatch.setattr(tools, "repo", repo)
+    return repo
+
+
+def count_git_calls(monkeypatch, command: str) -> list:
+    """包装 Git.execute, 记录 git <command> 子进程并放慢执行, 保证并发请求同时在执行中"""
+    calls = []
+    lock = threading.Lock()
+    origin = Git.execute
+
+    def execute(self, cmd, *args, **kwargs):
+        if len(cmd) > 1 and cmd[1] == command:
+            with lock:
+                calls.append(cmd)
+            time.sleep(0.2)
+        return origin(self, cmd, *args, **kwargs)
+
+    monkeypatch.setattr(Git, "execute", execute)
+    return calls
+
+
+async def gather_calls(coros):
+    return await asyncio.gather(*coros)
+
+
+def test_identical_requests_share_one_git_process(workspace, monkeypatch):
+    calls = count_git_calls(monkeypatch, "show")
+    results = asyncio.run(
+        gather_calls(
+            [tools.git_show.fn("main", "a.py", [0, 500]) for _ in range(8)]
+        )
+    )
+    assert len(calls) == 1
+    assert all(result == results[0] for result in results)
+    assert results[0]["content"] == "def foo():\n    return 1"
+
+
+def test_pagination_shares_one_git_process(workspace, monkeypatch):
+    calls = count_git_calls(monkeypatch, "show")
+    results = asyncio.run(
+        gather_calls(
+            [
+                tools.git_show.fn("main", "a.py", [0, 1]),
+                tools.git_show.fn("main", "a.py", [1, 2]),
+            ]
+        )
+    )
+    assert len(calls) == 1
+    assert results[0]["content"] == "def foo():"
+    assert results[1]["content"] == "    return 1"
+
+
+def test_different_keys_do_not_share(workspace, monkeypatch):
+    calls = count_git_calls(monkeypatch, "grep")
+    results = asyncio.run(
+        gather_calls(
+            [
+                tools.git_grep.fn("main", "foo", "*", [0, 50]),
+                # 只有分页参数不同, 共享执行
+                tools.git_grep.fn("main", "foo", "*", [0, 1]),
+                tools.git_grep.fn("main", "return", "*", [0, 50]),
+                # alias 与 main 指向同一个 commit, 但不应共享执行
+                tools.git_grep.fn("alias", "foo", "*", [0, 50]),
+            ]
+        )
+    )
+    assert len(calls) == 3
+    for result in results:
+        assert result["results"][0]["file_path"] == "a.py"
+
+
+def test_missing_file_error_names_branch(workspace):
+    branch_sha = workspace.commit("origin/main").hexsha
+    results = asyncio.run(
+        gather_calls(
+            [
+                tools.git_show.fn("main", "nope.py", [0, 500]),
+                tools.git_show.fn("alias", "nope.py", [0, 500]),
+            ]
+        )
+    )
+    assert "origin/main" in results[0]["message"]
+    assert "origin/alias" in results[1]["message"]
+    assert all(branch_sha not in result["message"] for result in results)
+
+
+def test_branch_name_in_reply(workspace):
+    results = asyncio.run(
+        gather_calls(
+            [
+                tools.git_ls_tree.fn("main", "not_exist", [0, 100]),
+                tools.git_ls_tree.fn("alias", "not_exist", [0, 100]),
+            ]
+        )
+    )
+    assert "`main`" in results[0]["message"]
+    assert "`alias`" in results[1]["message"]
+
+
+def test_single_flight_removes_finished_task():
+    single_flight = tools.SingleFlightUtil()
+
+    def fail():
+        raise ValueError("boom")
+
+    async def run():
+        results = await asyncio.gather(
+            single_flight.do(("key",), fail),
+            single_flight.do(("key",), fail),
+            return_exceptions=True,
+        )
+        return results
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert not single_flight._inflight